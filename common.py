@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script Name: common.py
+Description: This script loads and prepares the data shared by all network representations.
+Author: Martin Sterchi
+Date: 2026-10-14
+"""
+
+import os
+import pandas as pd
+
+# Stations that are merged with a neighbouring station (new name and BPUIC)
+NAME_MAP = {'Brig Bahnhofplatz': 'Brig', 'Lugano FLP': 'Lugano', 'Locarno FART': 'Locarno'}
+BPUIC_MAP = {'Brig Bahnhofplatz': 8501609, 'Lugano FLP': 8505300, 'Locarno FART': 8505400}
+
+# Function to convert a column of strings to datetime format by parsing each unique value only once
+def parse_datetime(col, fmt):
+    codes, uniques = pd.factorize(col)
+    parsed = pd.to_datetime(uniques, format = fmt)
+    return pd.Series(parsed.take(codes, allow_fill = True, fill_value = pd.NaT), index = col.index)
+
+# Function to load and prepare the data ("Actual Data" joined with "Service Points (Today)").
+# The prepared data is cached as Parquet files in 'cache_dir' and reused on subsequent calls.
+def load_and_prepare(cache_dir = 'cache'):
+
+    # Paths of the cached data
+    df_path = os.path.join(cache_dir, 'prepared.parquet')
+    ds_path = os.path.join(cache_dir, 'stations.parquet')
+
+    # Use the cached data if it exists
+    if os.path.exists(df_path) and os.path.exists(ds_path):
+        return pd.read_parquet(df_path), pd.read_parquet(ds_path)
+
+    # Load the data ("Actual Data"), reading only the relevant columns
+    df = pd.read_csv('raw/2025-03-05_istdaten.csv', sep = ";", engine = 'pyarrow',
+                     usecols = ['BETRIEBSTAG','FAHRT_BEZEICHNER','PRODUKT_ID','LINIEN_TEXT','FAELLT_AUS_TF','BPUIC',
+                                'HALTESTELLEN_NAME','ANKUNFTSZEIT','AN_PROGNOSE','ABFAHRTSZEIT','AB_PROGNOSE'],
+                     dtype = {'BPUIC': 'int64', 'FAELLT_AUS_TF': 'bool', 'PRODUKT_ID': 'category', 'LINIEN_TEXT': 'category'})
+
+    # Impute 'Zug'
+    df.loc[df["PRODUKT_ID"].isna(), "PRODUKT_ID"] = 'Zug'
+
+    # Convert BETRIEBSTAG to date format
+    df['BETRIEBSTAG'] = parse_datetime(df['BETRIEBSTAG'], "%d.%m.%Y")
+
+    # Convert ANKUNFTSZEIT, AN_PROGNOSE, ABFAHRTSZEIT, AB_PROGNOSE to datetime format
+    df['ANKUNFTSZEIT'] = parse_datetime(df['ANKUNFTSZEIT'], "%d.%m.%Y %H:%M")
+    df['AN_PROGNOSE'] = parse_datetime(df['AN_PROGNOSE'], "%d.%m.%Y %H:%M:%S")
+    df['ABFAHRTSZEIT'] = parse_datetime(df['ABFAHRTSZEIT'], "%d.%m.%Y %H:%M")
+    df['AB_PROGNOSE'] = parse_datetime(df['AB_PROGNOSE'], "%d.%m.%Y %H:%M:%S")
+
+    # First we reduce to only trains
+    df = df[df['PRODUKT_ID'] == "Zug"]
+    # Filter out all entries with FAELLT_AUS_TF == True
+    df = df[df['FAELLT_AUS_TF'] == False]
+    # Filter out all entries with LINIEN_TEXT == "ATZ" (car trains)
+    df = df[df['LINIEN_TEXT'] != "ATZ"]
+
+    # Use categorical codes for the Fahrt identifier (faster groupby)
+    df['FAHRT_BEZEICHNER'] = df['FAHRT_BEZEICHNER'].astype('category')
+
+    # Merge stations in Brig, Lugano, Locarno
+    df['BPUIC'] = df['HALTESTELLEN_NAME'].map(BPUIC_MAP).fillna(df['BPUIC']).astype('int64')
+    df['HALTESTELLEN_NAME'] = df['HALTESTELLEN_NAME'].replace(NAME_MAP)
+
+    # Load the data ("Service Points (Today)")
+    ds = pd.read_csv('raw/actual_date-swiss-only-service_point-2025-03-06.csv', sep = ";", low_memory = False)
+
+    # Keep only the relevant columns
+    ds = ds[["number","designationOfficial","cantonName","municipalityName","businessOrganisationDescriptionEn","wgs84East","wgs84North","height"]]
+
+    # Load the data ("Number of Passengers Boarding and Alighting")
+    ds_freq = pd.read_csv('raw/t01x-sbb-cff-ffs-frequentia-2023.csv', sep = ";", low_memory = False)
+
+    # For every station, we only keep the most recent measurements.
+    ds_freq = ds_freq.loc[ds_freq.groupby('UIC')['Jahr_Annee_Anno'].idxmax()]
+
+    # Remove thousand separator and make integers out of it.
+    freq_cols = ['DTV_TJM_TGM','DWV_TMJO_TFM','DNWV_TMJNO_TMGNL']
+    ds_freq[freq_cols] = ds_freq[freq_cols].replace('’', '', regex = True).astype(int)
+
+    # Keep only the relevant columns
+    ds_freq = ds_freq[["UIC","DTV_TJM_TGM","DWV_TMJO_TFM","DNWV_TMJNO_TMGNL"]]
+
+    # Join to 'ds'
+    ds = pd.merge(ds, ds_freq, left_on = 'number', right_on = 'UIC', how = 'left', validate = 'one_to_one')
+
+    # Drop 'UIC'
+    ds = ds.drop('UIC', axis=1)
+
+    # Better column names
+    ds.columns = ['BPUIC','STATION_NAME','CANTON','MUNICIPALITY','COMPANY',
+                  'LONGITUDE','LATITUDE','ELEVATION','AVG_DAILY_TRAFFIC',
+                  'AVG_DAILY_TRAFFIC_WEEKDAYS','AVG_DAILY_TRAFFIC_WEEKENDS']
+
+    # Left-join with station names and coordinates
+    df = pd.merge(df, ds.drop_duplicates('BPUIC'), on = 'BPUIC', how = 'left', validate = 'many_to_one', copy = False)
+
+    # There are 18 missing values for 'HALTESTELLEN_NAME' which we impute from 'STATION_NAME'.
+    df.loc[df['HALTESTELLEN_NAME'].isna(), "HALTESTELLEN_NAME"] = df.loc[df['HALTESTELLEN_NAME'].isna(), "STATION_NAME"]
+
+    # Use categorical codes for the station names as well
+    df['STATION_NAME'] = df['STATION_NAME'].astype('category')
+
+    # The station names are final now, so they can be stored as categories as well
+    df['HALTESTELLEN_NAME'] = df['HALTESTELLEN_NAME'].astype('category')
+
+    # Cache the prepared data
+    os.makedirs(cache_dir, exist_ok = True)
+    df.to_parquet(df_path, compression = 'zstd')
+    ds.to_parquet(ds_path, compression = 'zstd')
+
+    return df, ds
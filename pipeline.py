@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script Name: pipeline.py
+Description: This script creates all four network representations, loading and preparing the data only once.
+Author: Martin Sterchi
+Date: 2026-10-14
+"""
+
+from common import load_and_prepare
+from space_of_stops import build_sosto
+from space_of_stations import build_sosta
+from space_of_changes import build_socha
+from temporal import build_temporal
+
+# Main function to run the procedure
+def main():
+
+    # Load and prepare the data (shared by all representations)
+    df, ds = load_and_prepare()
+
+    # Create the four representations (none of them modifies 'df' or 'ds')
+    build_sosto(df, ds)
+    build_sosta(df, ds)
+    build_socha(df, ds)
+    build_temporal(df, ds)
+
+# -------------------------------------------------------------------------------------------------------
+if __name__ == "__main__":
+    main()
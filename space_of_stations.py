@@ -11,153 +11,69 @@ Date: 2025-07-23
 import warnings
 import pandas as pd
 import numpy as np
-import geopy.distance
-from collections import Counter, defaultdict
+from itertools import chain
+from common import load_and_prepare
 
 warnings.filterwarnings("ignore")
 
-# Function to sort entries within a group in ascending order of ABFAHRTSZEIT
-def sort_data(group):
-    return group.sort_values('ABFAHRTSZEIT', ascending = True)
-
-# Function to sort entries within a group in ascending order of KM
-def sort_data2(group):
-    return group.sort_values('KM', ascending = True)
-
-# Function to check whether elements a and b are NOT adjacent in lst.
-def is_shortcut(lst, a, b):
-    return not any((x, y) == (a, b) or (x, y) == (b, a) for x, y in zip(lst, lst[1:]))
-
-# Define a function to compute direct distance.
-def compute_distance(data, station1, station2):
-    return geopy.distance.geodesic(
-        data.loc[data['STATION_NAME'] == station1, "coord"].item(), 
-        data.loc[data['STATION_NAME'] == station2, "coord"].item()).km
+# Function to encode a 'Fahrt' and an undirected pair of stations (all given as integer codes) as one integer.
+def pair_keys(fahrt, station1, station2, num_stations):
+    return (fahrt * num_stations + np.minimum(station1, station2)) * num_stations + np.maximum(station1, station2)
+
+# Define a function to compute direct distances (haversine formula, in km) between arrays of coordinates.
+# The intermediate results are updated in place to avoid allocating a new array for every step.
+def compute_distance(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = np.radians(lat1), np.radians(lon1), np.radians(lat2), np.radians(lon2)
+    a = np.sin((lat2 - lat1) / 2)
+    np.square(a, out = a)
+    b = np.sin((lon2 - lon1) / 2)
+    np.square(b, out = b)
+    b *= np.cos(lat1)
+    b *= np.cos(lat2)
+    a += b
+    np.sqrt(a, out = a)
+    np.arcsin(a, out = a)
+    a *= 2 * 6371.0088
+    return a
             
-# Main function to run the procedure
-def main():
+# Function to create the space-of-stations representation from the prepared data
+def build_sosta(df, ds):
     
     # -----------------------------------------------------------------------
     # We first repeat the procedure to get the space-of-stops representation.
     
-    # Load the data ("Actual Data")
-    df = pd.read_csv('raw/2025-03-05_istdaten.csv', sep=";", low_memory=False)
-    
-    # Impute 'Zug'
-    df.loc[df["PRODUKT_ID"].isna(), "PRODUKT_ID"] = 'Zug'
-    
-    # Convert BETRIEBSTAG to date format
-    df['BETRIEBSTAG'] = pd.to_datetime(df['BETRIEBSTAG'], format = "%d.%m.%Y")
-    
-    # Convert ANKUNFTSZEIT, AN_PROGNOSE, ABFAHRTSZEIT, AB_PROGNOSE to datetime format
-    df['ANKUNFTSZEIT'] = pd.to_datetime(df['ANKUNFTSZEIT'], format = "%d.%m.%Y %H:%M")
-    df['AN_PROGNOSE'] = pd.to_datetime(df['AN_PROGNOSE'], format = "%d.%m.%Y %H:%M:%S")
-    df['ABFAHRTSZEIT'] = pd.to_datetime(df['ABFAHRTSZEIT'], format = "%d.%m.%Y %H:%M")
-    df['AB_PROGNOSE'] = pd.to_datetime(df['AB_PROGNOSE'], format = "%d.%m.%Y %H:%M:%S")
-    
-    # First we reduce to only trains
-    df = df[df['PRODUKT_ID'] == "Zug"]
-    # Filter out all entries with FAELLT_AUS_TF == True
-    df = df[df['FAELLT_AUS_TF'] == False]
-    # Filter out all entries with LINIEN_TEXT == "ATZ" (car trains)
-    df = df[df['LINIEN_TEXT'] != "ATZ"]
-    
-    # Merge stations in Brig, Lugano, Locarno
-    df.loc[df['HALTESTELLEN_NAME'] == "Brig Bahnhofplatz", "BPUIC"] = 8501609
-    df.loc[df['HALTESTELLEN_NAME'] == "Lugano FLP", "BPUIC"] = 8505300
-    df.loc[df['HALTESTELLEN_NAME'] == "Locarno FART", "BPUIC"] = 8505400
-    df.loc[df['HALTESTELLEN_NAME'] == "Brig Bahnhofplatz", "HALTESTELLEN_NAME"] = "Brig"
-    df.loc[df['HALTESTELLEN_NAME'] == "Lugano FLP", "HALTESTELLEN_NAME"] = "Lugano"
-    df.loc[df['HALTESTELLEN_NAME'] == "Locarno FART", "HALTESTELLEN_NAME"] = "Locarno"
-    
-    # Load the data ("Service Points (Today)")
-    ds = pd.read_csv('raw/actual_date-swiss-only-service_point-2025-03-06.csv', sep = ";", low_memory = False)
-    
-    # Keep only the relevant columns
-    ds = ds[["number","designationOfficial","cantonName","municipalityName","businessOrganisationDescriptionEn","wgs84East","wgs84North","height"]]
-    
-    # Load the data ("Number of Passengers Boarding and Alighting")
-    ds_freq = pd.read_csv('raw/t01x-sbb-cff-ffs-frequentia-2023.csv', sep = ";", low_memory = False)
-    
-    # For every station, we only keep the most recent measurements.
-    ds_freq = ds_freq.loc[ds_freq.groupby('UIC')['Jahr_Annee_Anno'].idxmax()]
-    
-    # Remove thousand separator and make integers out of it.
-    ds_freq['DTV_TJM_TGM'] = ds_freq['DTV_TJM_TGM'].str.replace('’', '').astype(int)
-    ds_freq['DWV_TMJO_TFM'] = ds_freq['DWV_TMJO_TFM'].str.replace('’', '').astype(int)
-    ds_freq['DNWV_TMJNO_TMGNL'] = ds_freq['DNWV_TMJNO_TMGNL'].str.replace('’', '').astype(int)
-    
-    # Keep only the relevant columns
-    ds_freq = ds_freq[["UIC","DTV_TJM_TGM","DWV_TMJO_TFM","DNWV_TMJNO_TMGNL"]]
-
-    # Join to 'ds'
-    ds = pd.merge(ds, ds_freq, left_on = 'number', right_on = 'UIC', how = 'left')
-
-    # Drop 'UIC'
-    ds = ds.drop('UIC', axis=1)
-
-    # Better column names
-    ds.columns = ['BPUIC','STATION_NAME','CANTON','MUNICIPALITY','COMPANY',
-                  'LONGITUDE','LATITUDE','ELEVATION','AVG_DAILY_TRAFFIC',
-                  'AVG_DAILY_TRAFFIC_WEEKDAYS','AVG_DAILY_TRAFFIC_WEEKENDS']
-
-    # Left-join with station names and coordinates
-    df = pd.merge(df, ds, on = 'BPUIC', how = 'left')
-
-    # There are 18 missing values for 'HALTESTELLEN_NAME' which we impute from 'STATION_NAME'.
-    df.loc[df['HALTESTELLEN_NAME'].isna(), "HALTESTELLEN_NAME"] = df.loc[df['HALTESTELLEN_NAME'].isna(), "STATION_NAME"]
-
     # First group by FAHRT_BEZEICHNER and then filter out all groups with only one entry
     # It's mostly trains that stop at a place at the border (I think)
-    df_filtered = df.groupby('FAHRT_BEZEICHNER').filter(lambda g: len(g) > 1)
-    
-    # Sort for each group
-    df_sorted = df_filtered.groupby('FAHRT_BEZEICHNER', group_keys=True).apply(sort_data, include_groups=False)
-    
-    # Empty list
-    edgelist = []
+    df_filtered = df.groupby('FAHRT_BEZEICHNER', observed = True).filter(lambda g: len(g) > 1)
     
-    # Variables to store previous row and its index
-    prev_row = None
-    prev_idx = None
-
-    # Loop over rows of dataframe
-    for i, row in df_sorted.iterrows():
-        # Only start with second row
-        # Only if the two rows belong to the same Fahrt
-        if prev_idx is not None and prev_idx == i[0]:
-            # Add edge to edgelist assuming it's a directed edge
-            edgelist.append((prev_row['STATION_NAME'], 
-                             row['STATION_NAME'], 
-                            (row['ANKUNFTSZEIT'] - prev_row['ABFAHRTSZEIT']).total_seconds() / 60))
-        # Set current row and row index to previous ones
-        prev_idx = i[0]
-        prev_row = row
+    # Sort by Fahrt and, within each Fahrt, in ascending order of ABFAHRTSZEIT
+    df_sorted = df_filtered.sort_values(['FAHRT_BEZEICHNER', 'ABFAHRTSZEIT'], kind = 'stable')
     
-    # Empty dict
-    edges = {}
+    # For every row, get the previous station and its departure time within the same Fahrt
+    df_sorted['PREV_STATION'] = df_sorted.groupby('FAHRT_BEZEICHNER', observed = True)['STATION_NAME'].shift(1)
+    df_sorted['PREV_AB'] = df_sorted.groupby('FAHRT_BEZEICHNER', observed = True)['ABFAHRTSZEIT'].shift(1)
 
-    # Loop over elements in edgelist
-    for i in edgelist:
-        # Create key
-        key = (i[0], i[1])
-        # Get previous entries in dict (if there are any)
-        prev = edges.get(key, (0, 0))
-        # Update values in dict
-        edges[key] = (prev[0] + 1, prev[1] + i[2])
+    # Drop the first row of every Fahrt (it has no previous station)
+    df_sorted = df_sorted.dropna(subset = ['PREV_STATION'])
 
-    # Divide summed up travel times by number of trips
-    edges = {k: (v[0], round(v[1]/v[0], 2)) for k, v in edges.items()}
+    # Travel time (minutes) from the previous station to the current one
+    df_sorted['DUR'] = (df_sorted['ANKUNFTSZEIT'] - df_sorted['PREV_AB']).dt.total_seconds() / 60
+
+    # Edgelist assuming directed edges
+    edgelist = pd.DataFrame({'S1': df_sorted['PREV_STATION'], 'S2': df_sorted['STATION_NAME'], 'DUR': df_sorted['DUR']})
+    
+    # Number of trips and average travel time for every edge (indexed by the pair of stations)
+    edges = edgelist.groupby(['S1','S2'], sort = False, observed = True)['DUR'].agg(
+        NUM_CONNECTIONS = 'size', AVG_DURATION = 'mean').round({'AVG_DURATION': 2})
 
     # Remove the two edges between Basel Bad Bf and Schaffhausen (there are German stations in-between)
-    del edges[('Basel Bad Bf', 'Schaffhausen')]
-    del edges[('Schaffhausen', 'Basel Bad Bf')]
+    edges = edges.drop([('Basel Bad Bf', 'Schaffhausen'), ('Schaffhausen', 'Basel Bad Bf')])
 
     # Set of stations that appear in edgelist
-    stations_in_edgelist = set(sum(list(edges.keys()), ()))
+    stations_in_edgelist = set(chain.from_iterable(edges.index))
 
     # Reduces nodes dataframe to only places in edgelist
-    nodes = ds[ds['STATION_NAME'].isin(stations_in_edgelist)]
+    nodes = ds.loc[ds['STATION_NAME'].isin(stations_in_edgelist)].copy()
     
     # Impute missing elevation for Tirano
     nodes.loc[nodes['STATION_NAME'] == "Tirano", "ELEVATION"] = 441    
@@ -165,11 +81,8 @@ def main():
     # Export node list
     nodes.sort_values("BPUIC").to_csv("nodelist.csv", sep = ';', encoding = 'utf-8', index = False)
 
-    # Transform edge dict to nested list and replace all station names with their BPUIC
-    edges = [[k[0], k[1], v[0], v[1]] for k,v in edges.items()]
-
-    # Create a dataframe
-    edges = pd.DataFrame(edges, columns = ['STATION1','STATION2','NUM_CONNECTIONS','AVG_DURATION'])
+    # Create a dataframe with the station names as columns
+    edges = edges.reset_index(names = ['STATION1','STATION2'])
     
     # -----------------------------------------------------------------------
     # Here comes the part specific to the space-of-stations representation.
@@ -178,55 +91,57 @@ def main():
     unique_undirected_edges = list(set((min(e1, e2), max(e1, e2)) for e1, e2 in zip(edges["STATION1"], edges["STATION2"])))
     
     # In order to make the procedure further below more efficient, we extract here all unique trips ("Fahrten").
-    # Empty dict
-    fahrten = {}
-
-    # Loop over grouped df.
-    # If the same key (sequence of stops) reappears, the value will be overwritten.
-    # But that behavior is desired: we only want to keep one FAHRT_BEZEICHNER per key.
-    for fahrt, group in df.groupby('FAHRT_BEZEICHNER'):
-        fahrten[tuple(group['STATION_NAME'])] = fahrt
+    # Sequence of stops of every 'Fahrt'.
+    fahrten = df.groupby('FAHRT_BEZEICHNER', observed = True)['STATION_NAME'].agg(tuple)
+
+    # We only want to keep one FAHRT_BEZEICHNER per sequence of stops (the last one).
+    fahrten = fahrten.drop_duplicates(keep = 'last').index
         
-    # Reduce the dataframe to the 'Fahrten' in list of values of dict.
-    df = df[df['FAHRT_BEZEICHNER'].isin(list(fahrten.values()))]
+    # Reduce the dataframe to the remaining 'Fahrten'.
+    df = df[df['FAHRT_BEZEICHNER'].isin(fahrten)]
+
+    # Create a dict with stations as keys and sets of FAHRT_BEZEICHNER as values.
+    result_dict = df.groupby('STATION_NAME', sort = False, observed = True)['FAHRT_BEZEICHNER'].agg(set).to_dict()
 
-    # defaultdict with lists
-    result_dict = defaultdict(list)
+    # Integer codes of the stations and 'Fahrten'.
+    stations = df['STATION_NAME'].cat.categories
+    fahrt_codes = df['FAHRT_BEZEICHNER'].cat.codes.to_numpy(np.int64)
+    station_codes = df['STATION_NAME'].cat.codes.to_numpy(np.int64)
 
-    # Iterate over rows
-    for _, row in df.iterrows():
-        # Create a dict with stations as keys and FAHRT_BEZEICHNER as values.
-        result_dict[row['STATION_NAME']].append(row['FAHRT_BEZEICHNER'])
+    # Code of the next station within the same 'Fahrt' (-1 for the last station).
+    next_codes = df.groupby('FAHRT_BEZEICHNER', observed = True)['STATION_NAME'].shift(-1).cat.codes.to_numpy(np.int64)
+    has_next = next_codes >= 0
 
-    # Convert back to normal dict.
-    result_dict = dict(result_dict)
+    # Keys of all pairs of adjacent stations in all 'Fahrten'.
+    adjacent_keys = pair_keys(fahrt_codes[has_next], station_codes[has_next], next_codes[has_next], len(stations))
 
-    # Empty list for shortcuts.
-    shortcut_edges = []
+    # Empty lists for the candidate ('Fahrt', edge) combinations.
+    cand_edges = []
+    cand_fahrten = []
 
     # Loop over list of undirected edges.
     for idx, edge in enumerate(unique_undirected_edges):
         # Find all 'Fahrten' in which both stations of the edge appear.
-        intersection = list(set(result_dict[edge[0]]) & set(result_dict[edge[1]]))
-        # Initialize shortcut to False
-        shortcut = False
-        # Loop over 'Fahrten' in which both stations of the edge appear.
-        for fahrt in intersection:
-            # Get the sequence of stations in current 'Fahrt'.
-            seq_of_stations = df.loc[df['FAHRT_BEZEICHNER'] == fahrt, 'STATION_NAME'].tolist()
-            # Check whether the edge represents a shortcut in that sequence.
-            shortcut = is_shortcut(seq_of_stations, edge[0], edge[1])
-            # If it is a shortcut, we add it to the list and break the inner loop.
-            if shortcut:
-                # Add to list and break the loop.
-                shortcut_edges.append((fahrt, edge))
-                break
-
-    # Extract only edges
-    shortcut_edges_clean = [i[1] for i in shortcut_edges]
+        intersection = list(result_dict[edge[0]] & result_dict[edge[1]])
+        # Every such 'Fahrt' is a candidate in which the edge could be a shortcut.
+        cand_edges += [idx] * len(intersection)
+        cand_fahrten += intersection
+
+    # Codes of the stations of the edges and of the candidate 'Fahrten'.
+    edge_codes1 = stations.get_indexer([e[0] for e in unique_undirected_edges])
+    edge_codes2 = stations.get_indexer([e[1] for e in unique_undirected_edges])
+    cand_edges = np.asarray(cand_edges, dtype = np.int64)
+    cand_fahrten = df['FAHRT_BEZEICHNER'].cat.categories.get_indexer(cand_fahrten)
+
+    # A candidate is a shortcut if the two stations are NOT adjacent in that 'Fahrt'.
+    cand_keys = pair_keys(cand_fahrten, edge_codes1[cand_edges], edge_codes2[cand_edges], len(stations))
+    cand_shortcut = ~np.isin(cand_keys, adjacent_keys)
+
+    # An edge is a shortcut if it is a shortcut in at least one 'Fahrt'.
+    is_shortcut = np.bincount(cand_edges, weights = cand_shortcut, minlength = len(unique_undirected_edges)) > 0
 
     # Get the final list of non-shortcut edges.
-    final_edges = [e for e in unique_undirected_edges if e not in shortcut_edges_clean]
+    final_edges = [e for e, shortcut in zip(unique_undirected_edges, is_shortcut) if not shortcut]
 
     # Load the data ("Line (Operation Points)")
     linien = pd.read_csv('raw/linie-mit-betriebspunkten.csv', sep = ";")
@@ -235,13 +150,13 @@ def main():
     linien = linien[["Name Haltestelle","Linie","KM","Linien Text","BPUIC"]]
 
     # Join the rows of nodelist based on BPUIC.
-    linien = pd.merge(linien, nodes[["BPUIC","STATION_NAME"]], on = 'BPUIC', how = 'left')
+    linien = pd.merge(linien, nodes[["BPUIC","STATION_NAME"]], on = 'BPUIC', how = 'left', validate = 'many_to_one')
 
     # Drop all rows that are not stations.
     linien = linien.dropna(subset = ["STATION_NAME"])
 
-    # Sort for each group
-    linien_sorted = linien.groupby('Linie', group_keys=False).apply(sort_data2)
+    # Sort by Linie and, within each Linie, in ascending order of KM
+    linien_sorted = linien.sort_values(['Linie', 'KM'], kind = 'stable')
 
     # Create a new column that for each row contains the next stop within the group.
     linien_sorted["NEXT_STATION"] = linien_sorted.groupby("Linie")["STATION_NAME"].shift(-1)
@@ -255,65 +170,69 @@ def main():
     # Drop all rows where 'NEXT_STATION' is missing
     linien_sorted = linien_sorted.dropna(subset = ["NEXT_STATION"])
 
-    # Now let's extract the edges
-    linien_edges = list(zip(linien_sorted['STATION_NAME'], linien_sorted['NEXT_STATION']))
-
-    # Make sure the tuples are arranged in the same way as above (and unique).
-    linien_edges = list(set((min(e[0], e[1]), max(e[0], e[1])) for e in linien_edges))
-
     # Manually remove edges.
-    final_edges.remove(('Bern', 'Zofingen'))
-    final_edges.remove(('Bern Wankdorf', 'Zürich HB'))
-    final_edges.remove(('Morges', 'Yverdon-les-Bains'))
-    final_edges.remove(('Aarau', 'Sissach'))
-    final_edges.remove(('Bergün/Bravuogn', 'Pontresina'))
-    final_edges.remove(('Interlaken West', 'Spiez'))
-    final_edges.remove(('Biel/Bienne', 'Grenchen Nord'))
-    final_edges.remove(('Chambrelien', 'Neuchâtel'))
-    final_edges.remove(('Concise', 'Yverdon-les-Bains'))
-    final_edges.remove(('Etoy', 'Rolle'))
-    final_edges.remove(('Klosters Platz', 'Susch')) # Avoid several edges representing the Vereina tunnel
+    edges_to_remove = {
+        ('Bern', 'Zofingen'),
+        ('Bern Wankdorf', 'Zürich HB'),
+        ('Morges', 'Yverdon-les-Bains'),
+        ('Aarau', 'Sissach'),
+        ('Bergün/Bravuogn', 'Pontresina'),
+        ('Interlaken West', 'Spiez'),
+        ('Biel/Bienne', 'Grenchen Nord'),
+        ('Chambrelien', 'Neuchâtel'),
+        ('Concise', 'Yverdon-les-Bains'),
+        ('Etoy', 'Rolle'),
+        ('Klosters Platz', 'Susch') # Avoid several edges representing the Vereina tunnel
+    }
+    final_edges = [e for e in final_edges if e not in edges_to_remove]
 
     # Manually add edges.
-    final_edges.append(('Biasca', 'Erstfeld')) # New Gotthard tunnel
-    final_edges.append(('Bern Wankdorf', 'Rothrist')) # Bahn-2000
-    final_edges.append(('Chambrelien', 'Corcelles-Peseux')) # Connector that was missing
-    final_edges.append(('Concise', 'Grandson')) # Connector that was missing
-    final_edges.append(('Immensee', 'Rotkreuz')) # Connector that was missing
-    final_edges.append(('Olten', 'Rothrist')) # Connector not going through Aarburg-Oftringen
-    final_edges.append(('Rothrist', 'Solothurn')) # Bahn-2000
-    final_edges.append(('Aarau', 'Däniken SO')) # Eppenberg tunnel
-    final_edges.append(('Liestal', 'Muttenz')) # Adler tunnel
-    final_edges.append(('Thalwil', 'Zürich HB')) # Zimmerberg tunnel
-    final_edges.append(('Zürich Altstetten', 'Zürich HB')) # Separate infrastructure connecting the two stations
-
-    # New column with coordinates in the same column.
-    nodes['coord'] = list(zip(nodes.LATITUDE, nodes.LONGITUDE))
+    final_edges += [
+        ('Biasca', 'Erstfeld'), # New Gotthard tunnel
+        ('Bern Wankdorf', 'Rothrist'), # Bahn-2000
+        ('Chambrelien', 'Corcelles-Peseux'), # Connector that was missing
+        ('Concise', 'Grandson'), # Connector that was missing
+        ('Immensee', 'Rotkreuz'), # Connector that was missing
+        ('Olten', 'Rothrist'), # Connector not going through Aarburg-Oftringen
+        ('Rothrist', 'Solothurn'), # Bahn-2000
+        ('Aarau', 'Däniken SO'), # Eppenberg tunnel
+        ('Liestal', 'Muttenz'), # Adler tunnel
+        ('Thalwil', 'Zürich HB'), # Zimmerberg tunnel
+        ('Zürich Altstetten', 'Zürich HB') # Separate infrastructure connecting the two stations
+    ]
+
+    # Create a dataframe of the final edges.
+    final_edges = pd.DataFrame(final_edges, columns = ['STATION1','STATION2'])
+
+    # Coordinates of the nodes indexed by station name.
+    coords = nodes.set_index('STATION_NAME')[['LATITUDE','LONGITUDE']]
+
+    # Coordinates of the first and second node of every edge.
+    coords1 = coords.loc[final_edges['STATION1']]
+    coords2 = coords.loc[final_edges['STATION2']]
 
     # Compute direct distances between node pairs.
-    final_edges = [(e[0], e[1], compute_distance(nodes, e[0], e[1])) for e in final_edges]
-
-    # List of edges including distances.
-    linien_edges = list(zip(linien_sorted['STATION_NAME'], linien_sorted['NEXT_STATION'], linien_sorted['DISTANCE']))
+    final_edges['DISTANCE_GEODESIC'] = compute_distance(coords1['LATITUDE'].to_numpy(), coords1['LONGITUDE'].to_numpy(),
+                                                        coords2['LATITUDE'].to_numpy(), coords2['LONGITUDE'].to_numpy())
 
-    # Make sure the tuples are arranged in the same way as above (and unique).
-    linien_edges = list(set((min(e[0], e[1]), max(e[0], e[1]), e[2]) for e in linien_edges))
+    # Edges including distances, with the tuples arranged in the same way as above (and unique).
+    linien_edges = pd.DataFrame({
+        'STATION1': np.minimum(linien_sorted['STATION_NAME'], linien_sorted['NEXT_STATION']),
+        'STATION2': np.maximum(linien_sorted['STATION_NAME'], linien_sorted['NEXT_STATION']),
+        'DISTANCE_EXACT': linien_sorted['DISTANCE']}).drop_duplicates(['STATION1','STATION2'])
 
-    # Convert to a dict.
-    linien_edges_dict = {(e[0], e[1]): e[2] for e in linien_edges}
-
-    # Add exact distance for edges that exist in dict with exact distance.
-    final_edges = [(n1, n2, dist, linien_edges_dict.get((n1, n2), np.nan)) for n1, n2, dist in final_edges]
+    # Add exact distance for edges that exist in the list of edges with exact distance.
+    final_edges = final_edges.merge(linien_edges, on = ['STATION1','STATION2'], how = 'left', validate = 'many_to_one', copy = False)
     
     # Create a node dict with BPUIC as values
     node_dict = dict(zip(nodes.STATION_NAME, nodes.BPUIC))
 
-    # Transform edge dict to nested list and replace all station names with their BPUIC.
+    # Replace all station names with their BPUIC.
     # Also, round the distances to 4 decimal points.
-    edges = [[node_dict[e[0]], node_dict[e[1]], round(e[2], 4), round(e[3], 4)] for e in final_edges]
-
-    # Create a dataframe
-    edges = pd.DataFrame(edges, columns = ['BPUIC1','BPUIC2','DISTANCE_GEODESIC','DISTANCE_EXACT'])
+    edges = pd.DataFrame({'BPUIC1': final_edges['STATION1'].map(node_dict),
+                          'BPUIC2': final_edges['STATION2'].map(node_dict),
+                          'DISTANCE_GEODESIC': final_edges['DISTANCE_GEODESIC'].round(4),
+                          'DISTANCE_EXACT': final_edges['DISTANCE_EXACT'].round(4)})
 
     # Correct mistake in edge between Baar Lindenpark and Zug.
     edges.loc[(edges['BPUIC1'] == 8515993) & (edges['BPUIC2'] == 8502204), 'DISTANCE_EXACT'] = 1.0593
@@ -321,6 +240,15 @@ def main():
     # Export edge list
     edges.to_csv("edgelist_SoSta.csv", sep = ';', encoding = 'utf-8', index = False)
 
+# Main function to run the procedure
+def main():
+
+    # Load and prepare the data (shared by all representations)
+    df, ds = load_and_prepare()
+
+    # Create the representation
+    build_sosta(df, ds)
+
 # -------------------------------------------------------------------------------------------------------
 if __name__ == "__main__":
     main()